@@ -1,8 +1,9 @@
 import os
+import json
 import requests
 import re
 import datetime
-import math 
+import math
 import threading
 
 from typing import List, Dict, Any, Optional
@@ -22,10 +23,35 @@ try:
 except ImportError:
     pass
 
+# orjson parses and serialises JSON several times faster than the stdlib;
+# fall back silently when it is not installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Constants
 TARGET_ORG = "apache"
 TARGET_LANGUAGES = {"Java", "Python", "C++"}
 COLLECTION_NAME = "mined-repos"
+# Hoisted once: these endpoints are constant, no need to rebuild the
+# strings inside the per-page / per-repo hot paths.
+ORG_API_URL = f"https://api.github.com/orgs/{TARGET_ORG}"
+ORG_REPOS_URL = f"{ORG_API_URL}/repos"
+GRAPHQL_URL = "https://api.github.com/graphql"
+RATE_LIMIT_URL = "https://api.github.com/rate_limit"
+# Repos resolved per GraphQL query. One query replaces this many REST calls.
+GRAPHQL_BATCH_SIZE = 50
+# Cap for the commit-counting phase. GitHub's secondary rate limits penalise
+# bursts of concurrent requests, so this stays well below the page-fetch
+# thread count. Tunable via env var for runs with a higher-budget token.
+COMMIT_COUNT_CONCURRENCY = int(os.getenv("COMMIT_COUNT_CONCURRENCY", "16"))
+# On-disk cache of commit counts keyed by API URL. Conditional requests
+# against the stored ETag turn unchanged repos into 304s, which cost no
+# rate-limit quota, so reruns only pay for repos that actually changed.
+COMMIT_COUNT_CACHE_PATH = os.path.join("data", "commit_count_cache.json")
+# Pre-compiled once: get_commit_count parses the Link header for every repo
+LAST_PAGE_PATTERN = re.compile(r'&page=(\d+)>; rel="last"')
 
 class RateLimitExceededError(Exception):
     pass
@@ -37,6 +63,37 @@ class ApacheGitHubMiner:
         # Event flag to stop all threads instantly if a critical error occurs
         self._stop_event = threading.Event()
         self._setup_session()
+        # Commit-count cache shared across worker threads
+        self._cache_lock = threading.Lock()
+        self._commit_cache = self._load_commit_cache()
+        self._cache_dirty = False
+
+    @staticmethod
+    def _load_commit_cache() -> Dict[str, Dict[str, Any]]:
+        """Loads the persisted commit-count cache, or an empty one if absent."""
+        try:
+            with open(COMMIT_COUNT_CACHE_PATH, "rb") as f:
+                cache = orjson.loads(f.read()) if orjson else json.load(f)
+                if isinstance(cache, dict):
+                    return cache
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _save_commit_cache(self):
+        """Persists the commit-count cache to disk if it changed this run."""
+        if not self._cache_dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(COMMIT_COUNT_CACHE_PATH), exist_ok=True)
+            if orjson:
+                with open(COMMIT_COUNT_CACHE_PATH, "wb") as f:
+                    f.write(orjson.dumps(self._commit_cache))
+            else:
+                with open(COMMIT_COUNT_CACHE_PATH, "w") as f:
+                    json.dump(self._commit_cache, f)
+        except OSError as e:
+            print(f"⚠️ Could not persist commit-count cache: {e}")
 
     def _setup_session(self):
         token = os.getenv("GITHUB_TOKEN")
@@ -69,11 +126,34 @@ class ApacheGitHubMiner:
             self._stop_event.set()
             raise RateLimitExceededError(f"RATE LIMIT REACHED! Resets at {reset_time}")
 
+    def check_rate_limit_budget(self) -> bool:
+        """
+        Fail-fast preflight: asks /rate_limit (which costs no quota) once
+        before mining starts, instead of discovering exhaustion through
+        per-request 403s mid-run. Returns False only when the core quota is
+        already spent; any error fails open so the normal per-response
+        checks take over.
+        """
+        try:
+            resp = self.session.get(RATE_LIMIT_URL, timeout=10)
+            if resp.status_code != 200:
+                return True
+
+            core = resp.json().get("resources", {}).get("core", {})
+            if core.get("remaining") == 0:
+                reset_val = core.get("reset")
+                reset_time = datetime.datetime.fromtimestamp(int(reset_val), datetime.timezone.utc) if reset_val else "Unknown"
+                print(f"🛑 Rate limit budget already exhausted. Resets at {reset_time}")
+                self._stop_event.set()
+                return False
+        except Exception:
+            pass
+        return True
+
     def get_total_org_repos(self) -> int:
         """Fetches the total number of public repos for the org."""
         try:
-            url = f"https://api.github.com/orgs/{TARGET_ORG}"
-            resp = self.session.get(url, timeout=10)
+            resp = self.session.get(ORG_API_URL, timeout=10)
             
             # Check for rate limit explicitly here too
             self._check_rate_limit(resp)
@@ -92,12 +172,11 @@ class ApacheGitHubMiner:
         if self._stop_event.is_set():
             return []
 
-        url = f"https://api.github.com/orgs/{TARGET_ORG}/repos"
         params = {"type": "public", "per_page": 100, "page": page_num}
         candidates = []
 
         try:
-            response = self.session.get(url, params=params, timeout=10)
+            response = self.session.get(ORG_REPOS_URL, params=params, timeout=10)
             self._check_rate_limit(response)
             response.raise_for_status()
             
@@ -108,9 +187,11 @@ class ApacheGitHubMiner:
                     if lang in TARGET_LANGUAGES:
                         candidates.append({
                             "name": repo["name"],
-                            "url": repo["html_url"],     
-                            "api_url": repo["url"],      
-                            "language": lang
+                            "url": repo["html_url"],
+                            "api_url": repo["url"],
+                            "language": lang,
+                            # Kept so the counting phase can skip empty repos
+                            "size": repo.get("size", 0)
                         })
         except RateLimitExceededError as e:
             # We assume the main thread or the first thread to hit this has already printed the error
@@ -125,15 +206,19 @@ class ApacheGitHubMiner:
 
     def fetch_candidate_repos(self) -> List[Dict[str, Any]]:
         # 1. PING CHECK
-        target_api = f"https://api.github.com/orgs/{TARGET_ORG}"
-        print(f"🔍 Checking connection to {target_api}...")
-        
+        print(f"🔍 Checking connection to {ORG_API_URL}...")
+
         # Modified utils.ping_target returns False on 403/429
-        if not ping_target(target_api):
+        if not ping_target(ORG_API_URL):
             print("🛑 Aborting mining operation. Cannot reach GitHub API (Check Internet or Rate Limit).")
             return []
 
-        # 2. Get total count
+        # 2. Rate-limit preflight (single free request)
+        if not self.check_rate_limit_budget():
+            print("🛑 Aborting mining operation. Rate limit quota is exhausted.")
+            return []
+
+        # 3. Get total count
         try:
             total_repos = self.get_total_org_repos()
         except RateLimitExceededError as e:
@@ -145,7 +230,7 @@ class ApacheGitHubMiner:
             print("❌ Error: Received 0 repositories from GitHub. This usually indicates an authentication issue or empty org.")
             return []
         
-        # 3. Calculate Pages
+        # 4. Calculate Pages
         total_pages = math.ceil(total_repos / 100)
         page_list = range(1, total_pages + 1)
         all_candidates = []
@@ -154,7 +239,7 @@ class ApacheGitHubMiner:
         print(f"⚡ Parallel fetching initialised: Retrieving {total_pages} pages using {self.num_threads} threads...\n")
         miner_intro.update_progress(0, total_repos, label="FETCHING LIST")
 
-        # 4. Fetch Pages
+        # 5. Fetch Pages
         with ThreadPool(self.num_threads) as pool:
             for page_results in pool.imap_unordered(self._fetch_page, page_list):
                 # If stop event was triggered by a worker, break the main loop
@@ -174,6 +259,9 @@ class ApacheGitHubMiner:
             print("❌ Process aborted due to Rate Limit.")
             return []
 
+        # Dedupe before any per-repo API spend
+        all_candidates = self._dedupe_candidates(all_candidates)
+
         if len(all_candidates) == 0:
             print("⚠️ No matching repositories found (Java/Python/C++).")
         else:
@@ -181,32 +269,138 @@ class ApacheGitHubMiner:
             
         return all_candidates
 
+    @staticmethod
+    def _dedupe_candidates(candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Drops candidates whose API URL was already seen, keeping first
+        occurrence order. Listing pagination can shift underneath the
+        parallel page fetch, and every duplicate would otherwise cost a
+        counting request and an extra DB upsert.
+        """
+        seen = set()
+        unique = []
+        for candidate in candidates:
+            if candidate["api_url"] not in seen:
+                seen.add(candidate["api_url"])
+                unique.append(candidate)
+        return unique
+
     def get_commit_count(self, api_url: str) -> int:
         if self._stop_event.is_set(): return 0
-        
+
+        cache_key = api_url.rstrip('/')
+        cached = self._commit_cache.get(cache_key)
+
+        # Conditional request: a 304 costs no rate-limit quota
+        extra_headers = {}
+        if cached:
+            if cached.get('etag'):
+                extra_headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                extra_headers['If-Modified-Since'] = cached['last_modified']
+
         try:
-            response = self.session.get(f"{api_url}/commits?per_page=1", timeout=10)
+            response = self.session.get(
+                f"{api_url}/commits?per_page=1", headers=extra_headers, timeout=10
+            )
             self._check_rate_limit(response)
-            
+
+            if response.status_code == 304 and cached:
+                return cached.get('count', 0)
+
             if response.status_code == 200:
+                count = 0
                 link_header = response.headers.get('Link')
                 if link_header:
-                    match = re.search(r'&page=(\d+)>; rel="last"', link_header)
-                    if match: return int(match.group(1))
-                
-                data = response.json()
-                return len(data) if isinstance(data, list) else 0
-            return 0 
+                    match = LAST_PAGE_PATTERN.search(link_header)
+                    if match: count = int(match.group(1))
+
+                if count == 0:
+                    data = response.json()
+                    count = len(data) if isinstance(data, list) else 0
+
+                with self._cache_lock:
+                    self._commit_cache[cache_key] = {
+                        'count': count,
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified'),
+                    }
+                    self._cache_dirty = True
+                return count
+            return 0
         except RateLimitExceededError:
             return 0 # Stop event is set inside check_rate_limit
         except Exception:
             return 0
 
+    def get_commit_counts_graphql(self, candidates: List[Dict[str, Any]]) -> Optional[Dict[str, int]]:
+        """
+        Resolves commit counts for many repos per request via the GraphQL API
+        (history(first: 0) { totalCount } on the default branch), instead of
+        one REST round-trip per repo. Requires a token; returns a mapping of
+        api_url -> count, or None so the caller can fall back to REST.
+        """
+        if "Authorization" not in self.session.headers:
+            return None
+
+        counts: Dict[str, int] = {}
+        total = len(candidates)
+
+        try:
+            for batch_start in range(0, total, GRAPHQL_BATCH_SIZE):
+                if self._stop_event.is_set():
+                    return None
+
+                batch = candidates[batch_start:batch_start + GRAPHQL_BATCH_SIZE]
+
+                # Build one aliased query for the whole batch
+                fields = []
+                for i, repo_data in enumerate(batch):
+                    # api_url format: https://api.github.com/repos/{owner}/{name}
+                    owner, name = repo_data["api_url"].rstrip("/").split("/")[-2:]
+                    fields.append(
+                        f'r{i}: repository(owner: "{owner}", name: "{name}") '
+                        '{ defaultBranchRef { target { ... on Commit '
+                        '{ history(first: 0) { totalCount } } } } }'
+                    )
+                query = "query { " + " ".join(fields) + " }"
+
+                response = self.session.post(GRAPHQL_URL, json={"query": query}, timeout=30)
+                self._check_rate_limit(response)
+                if response.status_code != 200:
+                    return None
+
+                data = response.json().get("data")
+                if not isinstance(data, dict):
+                    return None
+
+                for i, repo_data in enumerate(batch):
+                    node = data.get(f"r{i}") or {}
+                    branch = node.get("defaultBranchRef") or {}
+                    target = branch.get("target") or {}
+                    history = target.get("history") or {}
+                    # Empty repos have no default branch; count them as 0
+                    counts[repo_data["api_url"]] = history.get("totalCount", 0)
+
+                miner_intro.update_progress(len(counts), total, label="ANALYSING")
+        except RateLimitExceededError:
+            return None
+        except Exception:
+            # Any hiccup (schema change, network) falls back to the REST path
+            return None
+
+        return counts
+
     def process_repo(self, repo_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if self._stop_event.is_set():
             return None
 
-        commits = self.get_commit_count(repo_data["api_url"])
+        # Short-circuit: a size of 0 in the listing payload means an empty
+        # repository, so there is nothing to count and no API call to spend.
+        if repo_data.get("size", 1) == 0:
+            commits = 0
+        else:
+            commits = self.get_commit_count(repo_data["api_url"])
         return {
             "name": repo_data["name"],
             "url": repo_data["url"],
@@ -228,18 +422,46 @@ class ApacheGitHubMiner:
         results = []
         total = len(candidates)
         miner_intro.update_progress(0, total, label="ANALYSING")
+
+        # Preferred path: batch the counts through GraphQL (50 repos/query)
+        graphql_counts = self.get_commit_counts_graphql(candidates)
+
+        if graphql_counts is not None:
+            results = [
+                {
+                    "name": c["name"],
+                    "url": c["url"],
+                    "language": c["language"],
+                    "commits": graphql_counts.get(c["api_url"], 0)
+                }
+                for c in candidates
+            ]
+            miner_intro.update_progress(total, total, label="ANALYSING")
+        else:
+            # Fallback: one REST call per repo. Tighter pool than the
+            # page-fetch phase, since one request per repo at high
+            # concurrency trips GitHub's secondary rate limits.
+            # Only redraw the bar when the displayed percentage changes;
+            # a stdout write per counted repo just slows the inner loop down.
+            last_percent = -1
+            with ThreadPool(min(self.num_threads, COMMIT_COUNT_CONCURRENCY)) as pool:
+                for i, result in enumerate(pool.imap_unordered(self.process_repo, candidates)):
+                    if self._stop_event.is_set():
+                        break
+
+                    if result: # Check if result is not None
+                        results.append(result)
+
+                    percent = (i + 1) * 100 // total
+                    if percent != last_percent:
+                        miner_intro.update_progress(i + 1, total, label="ANALYSING")
+                        last_percent = percent
         
-        with ThreadPool(self.num_threads) as pool:
-            for i, result in enumerate(pool.imap_unordered(self.process_repo, candidates)):
-                if self._stop_event.is_set():
-                    break
-                
-                if result: # Check if result is not None
-                    results.append(result)
-                
-                miner_intro.update_progress(i + 1, total, label="ANALYSING")
-        
-        print("\n") 
+        print("\n")
+
+        # Persist whatever we counted, even on an aborted run, so the next
+        # attempt can resume via conditional requests.
+        self._save_commit_cache()
 
         if self._stop_event.is_set():
             print("❌ Mining aborted early due to Rate Limit.")
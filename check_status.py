@@ -1,8 +1,7 @@
 from db import (
     get_all_mined_project_names,
-    get_java_projects_to_mine,
-    get_python_projects_to_mine,
-    get_cpp_projects_to_mine,
+    count_repo_candidates,
+    count_mined_candidates,
     get_db_connection
 )
 import os
@@ -37,24 +36,17 @@ def check_status():
     # 1. Get the set of names for projects that have ACTUAL data mined
     # This queries the 'mined-commits-temp' collection
     already_mined_names = get_all_mined_project_names()
-    
-    # 2. Get the full lists of candidate projects from 'mined-repos'
-    java_candidates = get_java_projects_to_mine()
-    python_candidates = get_python_projects_to_mine()
-    cpp_candidates = get_cpp_projects_to_mine()
-    
-    # 3. Helper function to count intersections
-    def get_counts(candidates, mined_set):
-        mined_count = 0
-        for project in candidates:
-            if project['name'] in mined_set:
-                mined_count += 1
-        return mined_count, len(candidates)
 
-    # 4. Calculate stats
-    j_mined, j_total = get_counts(java_candidates, already_mined_names)
-    p_mined, p_total = get_counts(python_candidates, already_mined_names)
-    c_mined, c_total = get_counts(cpp_candidates, already_mined_names)
+    # 2. Helper function to count intersections.
+    # Both counts run server-side, so we never pull candidate documents
+    # over the wire just to test membership in Python.
+    def get_counts(language, mined_set):
+        return count_mined_candidates(language, mined_set), count_repo_candidates(language)
+
+    # 3. Calculate stats
+    j_mined, j_total = get_counts("Java", already_mined_names)
+    p_mined, p_total = get_counts("Python", already_mined_names)
+    c_mined, c_total = get_counts("C++", already_mined_names)
     
     total_mined = j_mined + p_mined + c_mined
     total_avail = j_total + p_total + c_total
@@ -167,6 +167,23 @@ def get_cpp_projects_to_mine():
     col = get_collection(REPO_COLLECTION)
     cursor = col.find({"language":"C++"}).sort("commit_count", ASCENDING)
     return list(cursor) 
+def count_repo_candidates(language: str) -> int:
+    """
+    Counts candidate repositories for a language without fetching documents.
+    """
+    col = get_collection(REPO_COLLECTION)
+    return col.count_documents({"language": language})
+
+def count_mined_candidates(language: str, mined_names: Set[str]) -> int:
+    """
+    Counts candidates for a language whose names appear in the mined set.
+    The membership test runs server-side via $in, so no documents cross the wire.
+    """
+    if not mined_names:
+        return 0
+    col = get_collection(REPO_COLLECTION)
+    return col.count_documents({"language": language, "name": {"$in": list(mined_names)}})
+
 def get_existing_commit_hashes(project_name):
     """
     Returns a Python Set containing all commit hashes already saved for a project.
@@ -18,7 +18,9 @@ def main() -> None:
     apache_miner.run_all()
 
     # Get summary from Database
-    project_count = get_collection("mined-repos").count_documents({})
+    # The total is unfiltered, so the collection-metadata estimate is enough
+    # and avoids the full scan count_documents({}) performs.
+    project_count = get_collection("mined-repos").estimated_document_count()
     print(f"\nReady to process {project_count} projects...")
 
     # Run Repository Miner
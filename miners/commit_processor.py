@@ -74,7 +74,8 @@ class CommitProcessor:
             # Batch write to DB to avoid hitting database connection limits
             if len(commits_buffer) >= self.batch_size:
                 save_commit_batch(commits_buffer)
-                commits_buffer = []
+                # Reuse the buffer so peak memory stays at one batch
+                commits_buffer.clear()
         
         # Save any remaining commits in the buffer
         if commits_buffer:
@@ -49,8 +49,11 @@ class FileAnalyser:
         Returns:
             dict: File metadata including filename, complexity, and changed methods.
         """
+        # changed_methods is an uncached PyDriller property that re-runs the
+        # Lizard before/after analysis on every access, so read it only once
+        changed_methods = file.changed_methods
         return {
             "filename": file.filename,
             "complexity": 0,
-            "changed_methods": [m.name for m in file.changed_methods] if file.changed_methods else []
+            "changed_methods": [m.name for m in changed_methods] if changed_methods else []
         }
@@ -145,9 +145,11 @@ class TestAnalyser:
             if not f.filename:
                 continue
             
+            # Single read: changed_methods recomputes its diff analysis per access
+            changed_methods = f.changed_methods
             file_info = {
                 'filename': f.filename,
-                'changed_methods': [m.name for m in f.changed_methods] if f.changed_methods else []
+                'changed_methods': [m.name for m in changed_methods] if changed_methods else []
             }
             
             if TestAnalyser.is_test_file(f.filename):
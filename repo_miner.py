@@ -46,6 +46,16 @@ Key Features:
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", "250")) 
 # Whether to print per-worker activity logs. Default off to avoid progress bar churn; enable with SHOW_WORKER_ACTIVITY=1.
 SHOW_WORKER_ACTIVITY = os.getenv("SHOW_WORKER_ACTIVITY", "0") == "1"
+# Threads PyDriller uses to traverse commits inside each worker process.
+# Kept modest because mine_repo already runs one process per CPU-ish; note
+# that num_workers > 1 yields commits out of order, which is fine here as
+# commits are deduplicated by hash rather than position.
+PYDRILLER_NUM_WORKERS = int(os.getenv("PYDRILLER_NUM_WORKERS", "4"))
+# GitHub auth resolved once at import time (db loads .env before this runs),
+# so _prepare_job doesn't re-read the environment and rebuild the header
+# dict for every project it shards.
+GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
+GITHUB_API_HEADERS = {'Authorization': f'token {GITHUB_TOKEN}'} if GITHUB_TOKEN else {}
 
 class Repo_miner:
     """
@@ -68,9 +78,9 @@ class Repo_miner:
             """
             Helper function to calculate remaining quota and sample new projects.
             """
-            # Check which projects are already done
-            completed = [p for p in candidates if p['name'] in already_mined]
-            current_count = len(completed)
+            # Check which projects are already done: a set intersection gives
+            # the count without materialising the completed documents
+            current_count = len({p['name'] for p in candidates} & already_mined)
             
             print(f"[{language_name}] Status: {current_count}/{target_quota} repositories mined.")
             
@@ -159,15 +169,9 @@ class Repo_miner:
                     if len(parts) >= 2:
                         owner, repo = parts[-2], parts[-1]
                         api_url = f"https://api.github.com/repos/{owner}/{repo}"
-                        
-                        # Get token from environment variables
-                        token = os.getenv('GITHUB_TOKEN') 
-                        headers = {}
-                        if token:
-                            headers['Authorization'] = f'token {token}'
 
                         # Makes a lightweight API call (Time: ~0.5s)
-                        response = requests.get(api_url, headers=headers, timeout=5)
+                        response = requests.get(api_url, headers=GITHUB_API_HEADERS, timeout=5)
                         
                         if response.status_code == 200:
                             data = response.json()
@@ -219,9 +223,10 @@ class Repo_miner:
 
             year_str = f""
             if SHOW_WORKER_ACTIVITY:
-                # Format dates for logging
-                s_str = start_date.strftime('%Y-%m') if start_date else "START"
-                e_str = end_date.strftime('%Y-%m') if end_date else "NOW"
+                # Format dates for logging; direct attribute formatting skips
+                # the strftime format-string parse
+                s_str = f"{start_date.year}-{start_date.month:02d}" if start_date else "START"
+                e_str = f"{end_date.year}-{end_date.month:02d}" if end_date else "NOW"
                 year_str = f"({s_str} to {e_str})"
                 tqdm.write(f"🚀 [Start] {project_name} {year_str}")
 
@@ -234,7 +239,8 @@ class Repo_miner:
                 repo_url,
                 since=start_date,
                 to=end_date,
-                only_modifications_with_file_types=list(VALID_CODE_EXTENSIONS)
+                only_modifications_with_file_types=list(VALID_CODE_EXTENSIONS),
+                num_workers=PYDRILLER_NUM_WORKERS
             )
             
             # Use CommitProcessor to traverse and extract metrics
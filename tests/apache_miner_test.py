@@ -1,48 +1,44 @@
 import unittest
 from unittest.mock import MagicMock, patch
-import sys
 import os
 import requests
+import responses
+
+# The db/miner_intro/utils stubs are installed in sys.modules by
+# tests/conftest.py before this module is imported
+from tests.conftest import mock_db
+
+from apache_miner import (
+    ApacheGitHubMiner,
+    RateLimitExceededError,
+    ORG_API_URL,
+    ORG_REPOS_URL,
+    GRAPHQL_URL,
+    RATE_LIMIT_URL,
+)
+
+# Shared once at module level: the Link header shape that exercises the
+# pagination regex in get_commit_count
+PAGINATION_LINK_HEADER = '<https://api.github.com/commits?per_page=1&page=500>; rel="last"'
 
-# -------------------------------------------------------------------------
-# PATH SETUP
-# -------------------------------------------------------------------------
-current_dir = os.path.dirname(os.path.abspath(__file__))
-parent_dir = os.path.dirname(current_dir)
-sys.path.insert(0, parent_dir)
-
-# -------------------------------------------------------------------------
-# MOCKING DEPENDENCIES
-# -------------------------------------------------------------------------
-# 1. Create the mocks globally
-mock_db = MagicMock()
-mock_intro = MagicMock()
-mock_utils = MagicMock()
-
-# 2. Configure utilities
-def pass_through_decorator(func):
-    return func
-mock_utils.measure_time.side_effect = pass_through_decorator
-mock_utils.ping_target.return_value = True 
-
-# 3. Inject mocks into sys.modules
-sys.modules['db'] = mock_db
-sys.modules['miner_intro'] = mock_intro
-sys.modules['utils'] = mock_utils
-
-# Now safe to import the actual miner
-from apache_miner import ApacheGitHubMiner, RateLimitExceededError
 
 class TestApacheGitHubMiner(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        """Build the miner once for the class; the Session/adapter setup is
+        the expensive part and is identical for every test."""
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "fake-token"}):
+            cls.miner = ApacheGitHubMiner(num_threads=1)
+            cls.miner.session.mount = MagicMock()
+
     def setUp(self):
-        """Set up a fresh miner instance before every test."""
+        """Reset the mutable state of the shared miner before every test."""
         # Reset the DB mock calls to ensure a clean slate for each test
         mock_db.reset_mock()
-        
-        with patch.dict(os.environ, {"GITHUB_TOKEN": "fake-token"}):
-            self.miner = ApacheGitHubMiner(num_threads=1)
-            self.miner.session.mount = MagicMock()
+        self.miner._stop_event.clear()
+        self.miner._commit_cache = {}
+        self.miner._cache_dirty = False
 
     def test_init_sets_headers(self):
         self.assertIn("Authorization", self.miner.session.headers)
@@ -83,34 +79,26 @@ class TestApacheGitHubMiner(unittest.TestCase):
     # -------------------------------------------------------------------------
     # Repo Count
     # -------------------------------------------------------------------------
-    @patch('apache_miner.requests.Session.get')
-    def test_get_total_org_repos_success(self, mock_get):
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"public_repos": 150}
-        mock_get.return_value = mock_response
+    @responses.activate
+    def test_get_total_org_repos_success(self):
+        responses.add(responses.GET, ORG_API_URL, json={"public_repos": 150})
         self.assertEqual(self.miner.get_total_org_repos(), 150)
 
-    @patch('apache_miner.requests.Session.get')
-    def test_get_total_org_repos_failure(self, mock_get):
-        mock_response = MagicMock()
-        mock_response.status_code = 404 
-        mock_get.return_value = mock_response
+    @responses.activate
+    def test_get_total_org_repos_failure(self):
+        responses.add(responses.GET, ORG_API_URL, status=404)
         self.assertEqual(self.miner.get_total_org_repos(), 0)
 
     # -------------------------------------------------------------------------
     # Fetch Page
     # -------------------------------------------------------------------------
-    @patch('apache_miner.requests.Session.get')
-    def test_fetch_page_filtering(self, mock_get):
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = [
+    @responses.activate
+    def test_fetch_page_filtering(self):
+        responses.add(responses.GET, ORG_REPOS_URL, json=[
             {"name": "ProjectA", "html_url": "url1", "url": "api1", "language": "Java"},
             {"name": "ProjectB", "html_url": "url2", "url": "api2", "language": "Go"},
             {"name": "ProjectC", "html_url": "url3", "url": "api3", "language": "Python"},
-        ]
-        mock_get.return_value = mock_response
+        ])
         results = self.miner._fetch_page(1)
         self.assertEqual(len(results), 2)
         self.assertEqual(results[0]['language'], "Java")
@@ -120,31 +108,100 @@ class TestApacheGitHubMiner(unittest.TestCase):
         self.miner._stop_event.set()
         self.assertEqual(self.miner._fetch_page(1), [])
 
+    def test_dedupe_candidates_keeps_first_occurrence(self):
+        candidates = [
+            {"name": "RepoA", "api_url": "a1", "language": "Java"},
+            {"name": "RepoB", "api_url": "a2", "language": "Python"},
+            {"name": "RepoA-dup", "api_url": "a1", "language": "Java"},
+        ]
+        result = ApacheGitHubMiner._dedupe_candidates(candidates)
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[0]["name"], "RepoA")
+        self.assertEqual(result[1]["name"], "RepoB")
+
     # -------------------------------------------------------------------------
     # Commit Counting
     # -------------------------------------------------------------------------
-    @patch('apache_miner.requests.Session.get')
-    def test_get_commit_count_pagination_trick(self, mock_get):
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        # Correctly formatted URL param for the regex to find
-        mock_response.headers = {'Link': '<https://api.github.com/commits?per_page=1&page=500>; rel="last"'}
-        mock_get.return_value = mock_response
-        self.assertEqual(self.miner.get_commit_count("http://fake.api"), 500)
-
-    @patch('apache_miner.requests.Session.get')
-    def test_get_commit_count_small_repo(self, mock_get):
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.headers = {}
-        mock_response.json.return_value = [1, 2, 3, 4, 5] 
-        mock_get.return_value = mock_response
-        self.assertEqual(self.miner.get_commit_count("http://fake.api"), 5)
+    @responses.activate
+    def test_get_commit_count_variants(self):
+        """One parametrised test for the response shapes get_commit_count handles."""
+        cases = [
+            # (label, headers, json_body, expected)
+            # Correctly formatted URL param for the regex to find
+            ("pagination trick", {'Link': PAGINATION_LINK_HEADER}, [], 500),
+            # No Link header: fall back to counting the returned page
+            ("small repo", {}, [1, 2, 3, 4, 5], 5),
+        ]
+        for label, headers, json_body, expected in cases:
+            with self.subTest(label):
+                responses.reset()
+                responses.add(responses.GET, "http://fake.api/commits",
+                              json=json_body, headers=headers)
+                self.miner._commit_cache = {}
+                self.assertEqual(self.miner.get_commit_count("http://fake.api"), expected)
 
     def test_get_commit_count_returns_zero_on_stop(self):
         self.miner._stop_event.set()
         self.assertEqual(self.miner.get_commit_count("http://fake.api"), 0)
 
+    @responses.activate
+    def test_get_commit_count_stores_etag_in_cache(self):
+        responses.add(responses.GET, "http://fake.api/commits", json=[], headers={
+            'Link': PAGINATION_LINK_HEADER,
+            'ETag': '"abc123"'
+        })
+        self.miner.get_commit_count("http://fake.api")
+        self.assertEqual(self.miner._commit_cache["http://fake.api"]['count'], 500)
+        self.assertEqual(self.miner._commit_cache["http://fake.api"]['etag'], '"abc123"')
+        self.assertTrue(self.miner._cache_dirty)
+
+    @responses.activate
+    def test_get_commit_count_304_returns_cached(self):
+        # Seed the cache as if a previous run stored this repo
+        self.miner._commit_cache["http://fake.api"] = {
+            'count': 42, 'etag': '"abc123"', 'last_modified': None
+        }
+        responses.add(responses.GET, "http://fake.api/commits", status=304)
+        self.assertEqual(self.miner.get_commit_count("http://fake.api"), 42)
+        # Conditional header must have been sent
+        self.assertEqual(responses.calls[0].request.headers.get('If-None-Match'), '"abc123"')
+
+    # -------------------------------------------------------------------------
+    # GraphQL Batch Counting
+    # -------------------------------------------------------------------------
+    def test_graphql_counts_require_token(self):
+        with patch.dict(os.environ, {}, clear=True):
+            miner = ApacheGitHubMiner(num_threads=1)
+        self.assertIsNone(miner.get_commit_counts_graphql([{"api_url": "a1"}]))
+
+    @responses.activate
+    def test_graphql_counts_batch_success(self):
+        responses.add(responses.POST, GRAPHQL_URL, json={
+            "data": {
+                "r0": {"defaultBranchRef": {"target": {"history": {"totalCount": 500}}}},
+                # Empty repo: no default branch
+                "r1": {"defaultBranchRef": None},
+            }
+        })
+
+        candidates = [
+            {"api_url": "https://api.github.com/repos/apache/arrow"},
+            {"api_url": "https://api.github.com/repos/apache/empty"},
+        ]
+        counts = self.miner.get_commit_counts_graphql(candidates)
+        self.assertEqual(counts, {
+            "https://api.github.com/repos/apache/arrow": 500,
+            "https://api.github.com/repos/apache/empty": 0,
+        })
+        # Both repos resolved in a single POST
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    def test_graphql_counts_fall_back_on_error(self):
+        responses.add(responses.POST, GRAPHQL_URL, status=502)
+        candidates = [{"api_url": "https://api.github.com/repos/apache/arrow"}]
+        self.assertIsNone(self.miner.get_commit_counts_graphql(candidates))
+
     # -------------------------------------------------------------------------
     # Orchestration
     # -------------------------------------------------------------------------
@@ -154,19 +211,47 @@ class TestApacheGitHubMiner(unittest.TestCase):
         self.assertEqual(self.miner.fetch_candidate_repos(), [])
 
     @patch('apache_miner.ping_target')
+    @patch('apache_miner.ApacheGitHubMiner.check_rate_limit_budget')
     @patch('apache_miner.ApacheGitHubMiner.get_total_org_repos')
-    def test_fetch_candidate_repos_aborts_on_zero_repos(self, mock_get_total, mock_ping):
+    def test_fetch_candidate_repos_aborts_on_zero_repos(self, mock_get_total, mock_budget, mock_ping):
+        mock_ping.return_value = True
+        mock_budget.return_value = True
+        mock_get_total.return_value = 0
+        self.assertEqual(self.miner.fetch_candidate_repos(), [])
+
+    @patch('apache_miner.ping_target')
+    @patch('apache_miner.ApacheGitHubMiner.check_rate_limit_budget')
+    def test_fetch_candidate_repos_aborts_on_spent_budget(self, mock_budget, mock_ping):
         mock_ping.return_value = True
-        mock_get_total.return_value = 0 
+        mock_budget.return_value = False
         self.assertEqual(self.miner.fetch_candidate_repos(), [])
 
+    @responses.activate
+    def test_rate_limit_preflight_detects_exhaustion(self):
+        responses.add(responses.GET, RATE_LIMIT_URL, json={
+            "resources": {"core": {"remaining": 0, "reset": 1700000000}}
+        })
+        self.assertFalse(self.miner.check_rate_limit_budget())
+        self.assertTrue(self.miner._stop_event.is_set())
+
+    @responses.activate
+    def test_rate_limit_preflight_passes_with_budget(self):
+        responses.add(responses.GET, RATE_LIMIT_URL, json={
+            "resources": {"core": {"remaining": 4200, "reset": 1700000000}}
+        })
+        self.assertTrue(self.miner.check_rate_limit_budget())
+        self.assertFalse(self.miner._stop_event.is_set())
+
+    @patch('apache_miner.ApacheGitHubMiner.get_commit_counts_graphql')
     @patch('apache_miner.ApacheGitHubMiner.get_commit_count')
     @patch('apache_miner.ApacheGitHubMiner.fetch_candidate_repos')
-    @patch('apache_miner.ThreadPool') 
-    def test_run_success_flow(self, mock_threadpool, mock_fetch, mock_get_commits):
+    @patch('apache_miner.ThreadPool')
+    def test_run_success_flow(self, mock_threadpool, mock_fetch, mock_get_commits, mock_graphql):
         """
-        Test the main run loop.
+        Test the main run loop (REST fallback path).
         """
+        # Force the REST fallback so the ThreadPool path is exercised
+        mock_graphql.return_value = None
         # 1. Setup Data
         mock_fetch.return_value = [
             {"name": "Repo1", "url": "u1", "api_url": "a1", "language": "Java"}
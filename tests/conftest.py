@@ -0,0 +1,76 @@
+"""
+Shared test setup.
+
+The modules under test import db, miner_intro and utils at module level,
+so the stand-ins below must already be in sys.modules when the first test
+module imports them. That is why the stubs are installed at conftest
+import time (pytest loads conftest before collecting any test module)
+rather than inside an autouse fixture, which would run too late.
+"""
+
+import os
+import sys
+import types
+from unittest.mock import MagicMock
+
+# -------------------------------------------------------------------------
+# PATH SETUP: make the project root importable from the tests package
+# -------------------------------------------------------------------------
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+# -------------------------------------------------------------------------
+# MODULE STUBS: keep tests away from MongoDB and the terminal animations
+# -------------------------------------------------------------------------
+mock_db = MagicMock()
+mock_intro = MagicMock()
+mock_utils = MagicMock()
+
+
+def _pass_through_decorator(func):
+    return func
+
+
+mock_utils.measure_time.side_effect = _pass_through_decorator
+mock_utils.ping_target.return_value = True
+
+sys.modules['db'] = mock_db
+sys.modules['miner_intro'] = mock_intro
+sys.modules['utils'] = mock_utils
+
+
+class NoOpTqdm:
+    """
+    Minimal no-op replacement for the tqdm progress bar: passes iterables
+    through untouched and swallows the bar bookkeeping, so tests neither
+    pay for terminal updates nor garble pytest's output.
+    """
+
+    def __init__(self, iterable=None, *args, **kwargs):
+        self.iterable = iterable if iterable is not None else []
+
+    def __iter__(self):
+        return iter(self.iterable)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def update(self, n=1):
+        pass
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def write(message, *args, **kwargs):
+        pass
+
+
+_tqdm_stub = types.ModuleType('tqdm')
+_tqdm_stub.tqdm = NoOpTqdm
+sys.modules['tqdm'] = _tqdm_stub
@@ -1,69 +1,91 @@
 import pytest
 from unittest.mock import MagicMock, patch, PropertyMock, ANY
+from concurrent.futures import Future
 from datetime import datetime
+
+import repo_miner
+import miners.commit_processor as commit_processor
 from repo_miner import Repo_miner
 from miners.test_analyser import TestAnalyser
 
 # --- Fixtures to mock external dependencies ---
 
 @pytest.fixture
-def mock_db():
+def mock_db(monkeypatch):
     """Mocks the database functions to prevent real DB connections."""
-    with patch('repo_miner.get_java_projects_to_mine') as mock_java, \
-         patch('repo_miner.get_python_projects_to_mine') as mock_python, \
-         patch('repo_miner.get_cpp_projects_to_mine') as mock_cpp, \
-         patch('repo_miner.get_all_mined_project_names') as mock_mined_names, \
-         patch('miners.commit_processor.get_existing_commit_hashes') as mock_hashes, \
-         patch('miners.commit_processor.save_commit_batch') as mock_save, \
-         patch('repo_miner.ensure_indexes') as mock_indexes:
-        
-        # Setup sample return values
-        mock_java.return_value = [{'name': 'java-repo', 'url': 'http://github.com/test/java', 'language': 'Java'}]
-        mock_python.return_value = [{'name': 'py-repo', 'url': 'http://github.com/test/py', 'language': 'Python'}]
-        mock_cpp.return_value = [{'name': 'cpp-repo', 'url': 'http://github.com/test/cpp', 'language': 'C++'}]
-        mock_mined_names.return_value = set()
-        mock_hashes.return_value = set() # No existing hashes by default
-        
-        yield {
-            'java': mock_java,
-            'python': mock_python,
-            'cpp': mock_cpp,
-            'mined_names': mock_mined_names,
-            'hashes': mock_hashes,
-            'save': mock_save
-        }
+    mocks = {
+        'java': MagicMock(return_value=[{'name': 'java-repo', 'url': 'http://github.com/test/java', 'language': 'Java'}]),
+        'python': MagicMock(return_value=[{'name': 'py-repo', 'url': 'http://github.com/test/py', 'language': 'Python'}]),
+        'cpp': MagicMock(return_value=[{'name': 'cpp-repo', 'url': 'http://github.com/test/cpp', 'language': 'C++'}]),
+        'mined_names': MagicMock(return_value=set()),
+        'hashes': MagicMock(return_value=set()), # No existing hashes by default
+        'save': MagicMock(),
+    }
+
+    monkeypatch.setattr(repo_miner, 'get_java_projects_to_mine', mocks['java'])
+    monkeypatch.setattr(repo_miner, 'get_python_projects_to_mine', mocks['python'])
+    monkeypatch.setattr(repo_miner, 'get_cpp_projects_to_mine', mocks['cpp'])
+    monkeypatch.setattr(repo_miner, 'get_all_mined_project_names', mocks['mined_names'])
+    monkeypatch.setattr(repo_miner, 'ensure_indexes', MagicMock())
+    monkeypatch.setattr(commit_processor, 'get_existing_commit_hashes', mocks['hashes'])
+    monkeypatch.setattr(commit_processor, 'save_commit_batch', mocks['save'])
+
+    return mocks
 
 @pytest.fixture
-def mock_pydriller():
+def mock_pydriller(monkeypatch):
     """Mocks the Repository class to prevent actual git cloning."""
-    with patch('repo_miner.Repository') as mock_repo:
-        yield mock_repo
+    mock_repo = MagicMock()
+    monkeypatch.setattr(repo_miner, 'Repository', mock_repo)
+    return mock_repo
 
-@pytest.fixture
-def mock_executor():
-    """Mocks the ProcessPoolExecutor to prevent spawning real processes."""
-    with patch('repo_miner.ProcessPoolExecutor') as mock_pool:
-        # Create a mock executor instance
-        executor_instance = MagicMock()
-        mock_pool.return_value.__enter__.return_value = executor_instance
-        yield executor_instance
+class InlineExecutor:
+    """
+    Synchronous stand-in for ProcessPoolExecutor: submit() runs the task
+    inline and returns an already-completed Future, so the production code's
+    as_completed / future.result() flow works unmodified without spawning
+    any worker processes. submit is a recording MagicMock so tests can still
+    assert on the submitted jobs.
+    """
+    def __init__(self, max_workers=None):
+        self.submit = MagicMock(side_effect=self._run_inline)
 
-# --- Unit Tests ---
+    @staticmethod
+    def _run_inline(fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
 
-def test_clean_url_valid():
-    """Test that URLs are cleaned correctly."""
-    assert Repo_miner.clean_url("https://github.com/user/repo") == "https://github.com/user/repo"
-    assert Repo_miner.clean_url("https://github.com/user/repo/") == "https://github.com/user/repo"
+    def __enter__(self):
+        return self
 
-def test_clean_url_correction():
-    """Test that malformed port-style URLs are fixed."""
-    malformed = "https://github.com:user/repo"
-    expected = "https://github.com/user/repo"
-    assert Repo_miner.clean_url(malformed) == expected
+    def __exit__(self, *exc_info):
+        return False
 
-def test_clean_url_none():
-    """Test that None input returns None."""
-    assert Repo_miner.clean_url(None) is None
+@pytest.fixture
+def mock_executor(monkeypatch):
+    """Swaps the ProcessPoolExecutor for a synchronous inline shim."""
+    executor = InlineExecutor()
+    monkeypatch.setattr(repo_miner, 'ProcessPoolExecutor', lambda max_workers=None: executor)
+    return executor
+
+# --- Unit Tests ---
+
+@pytest.mark.parametrize("raw_url,expected", [
+    # Already clean URLs pass through (trailing slash stripped)
+    ("https://github.com/user/repo", "https://github.com/user/repo"),
+    ("https://github.com/user/repo/", "https://github.com/user/repo"),
+    # Malformed port-style URLs are fixed
+    ("https://github.com:user/repo", "https://github.com/user/repo"),
+    # None input returns None
+    (None, None),
+])
+def test_clean_url(raw_url, expected):
+    """Test URL sanitisation across valid, malformed and empty inputs."""
+    assert Repo_miner.clean_url(raw_url) == expected
 
 def test_miner_initialisation_sampling(mock_db):
     """Test that the miner samples 60 projects from each language."""
@@ -137,7 +159,8 @@ def test_mine_repo_success(mock_db, mock_pydriller):
         "http://github.com/test",
         since=start_date,
         to=end_date,
-        only_modifications_with_file_types=ANY
+        only_modifications_with_file_types=ANY,
+        num_workers=ANY
     )
     
     # Verify save was called
@@ -188,31 +211,18 @@ def test_run_creates_shards_for_cpp(mock_db, mock_executor):
     mock_db['java'].return_value = [{'name': 'java-repo', 'url': 'u', 'language': 'Java'}]
     mock_db['python'].return_value = [] 
 
-    # 2. Setup the Mock Future
-    # This acts as the "result" of a single worker task.
-    # We return a tuple of 4 Nones/Zeroes to satisfy the unpacking: p_name, added, existing, error
-    mock_future = MagicMock()
-    mock_future.result.return_value = ("mock-project", 0, 0, None) 
-
-    # 3. Configure the Executor to return this mock future
-    mock_executor.submit.return_value = mock_future
-
-     # 4. Mock first commit from PyDriller
+    # 2. Mock first commit from PyDriller
+    # (jobs run inline through the executor shim, so mine_repo really
+    # executes and needs a Repository to traverse)
     fake_commit = MagicMock()
     fake_commit.author_date = datetime(2000, 1, 1)
 
     fake_repo = MagicMock()
     fake_repo.traverse_commits.return_value = [fake_commit]
 
-    # 4. Patch 'as_completed' to immediately yield our mock future
     with patch('random.sample', side_effect=lambda pop, k: pop[:k]), \
-         patch('repo_miner.as_completed') as mock_as_completed,\
          patch('repo_miner.Repository', return_value=fake_repo):
 
-        # Make as_completed yield a list containing our mock future
-        # (This mimics the executor finishing tasks instantly)
-        mock_as_completed.side_effect = lambda futures: futures
-
         miner = Repo_miner()
         
         # Freezing time logic for assertion
@@ -220,10 +230,10 @@ def test_run_creates_shards_for_cpp(mock_db, mock_executor):
         first_year = 2000
         expected_shards = (current_year + 1) - first_year
         
-        # 5. Run the method
+        # 3. Run the method
         miner.run()
-        
-        # 6. Verify Logic
+
+        # 4. Verify Logic
         total_calls = mock_executor.submit.call_count
         assert total_calls == 1 + expected_shards
         
@@ -5,6 +5,18 @@ from unittest.mock import MagicMock
 
 import source_file_calculator as sfc
 
+# Fake Trees-API payload, built once at module scope. Tests only read it,
+# so sharing one instance avoids rebuilding the structure per test.
+FAKE_TREE = [
+    {"path": "src/main/java/App.java", "type": "blob"},
+    {"path": "tests/test_app.py", "type": "blob"},
+    {"path": "README.md", "type": "blob"},
+    {"path": "lib/module.cpp", "type": "blob"},
+    {"path": "scripts/build.sh", "type": "blob"},
+    {"path": "docs/manual.txt", "type": "blob"},
+]
+FAKE_TREE_JSON = {"tree": FAKE_TREE}
+
 
 def test_parse_github_url_valid():
     owner, repo = sfc.parse_github_url("https://github.com/owner/repo.git")
@@ -22,20 +34,9 @@ def test_parse_github_url_invalid():
 
 
 def test_count_files_github_success_counts(monkeypatch):
-    # Prepare fake API response JSON
-    fake_tree = [
-        {"path": "src/main/java/App.java", "type": "blob"},
-        {"path": "tests/test_app.py", "type": "blob"},
-        {"path": "README.md", "type": "blob"},
-        {"path": "lib/module.cpp", "type": "blob"},
-        {"path": "scripts/build.sh", "type": "blob"},
-        {"path": "docs/manual.txt", "type": "blob"},
-    ]
-    fake_json = {"tree": fake_tree}
-
     fake_response = MagicMock()
     fake_response.status_code = 200
-    fake_response.json.return_value = fake_json
+    fake_response.json.return_value = FAKE_TREE_JSON
 
     calls = {}
 